@@ -14,147 +14,200 @@ Space: O(n ^ 2)
 
 Where, n is the number of states. The time complexity is dominated by the matrix
 multiplication step.
+
+Passing a dict as stats records the number of transient and absorbing states and
+the time split between building the standard form, inverting I - Q and the
+final multiplication.
+
+AbsorbingChain keeps the fundamental matrix F = Inverse(I - Q) of a chain whose rows
+change over time. When the row of a transient state i changes and it stays transient,
+only row i of I - Q changes, that is I - Q becomes I - Q + e_i * u where u is the
+change of the row negated. The Sherman-Morrison formula then gives the new inverse in
+O(n ^ 2) without inverting again:
+
+Inverse(I - Q + e_i * u) = F - (F * e_i) * (u * F) / (1 + u * F * e_i)
+
+All values are Fractions so the update is exact. When a state flips between absorbing
+and transient the split of the states changes and the chain is solved again.
 """
 from collections import Counter
-from copy import deepcopy
 from fractions import Fraction
 from math import gcd
+from time import perf_counter
 
 
-def solution(m):
+def minor(matrix, i, j):
     """
-    Calculates the preobabilities of terminating at abosrbing states.
+    Calculates the minor of a matrix at a particular cell.
 
     Args:
-        m: A nxn square matrix of integers representing the number of transitions
-           from state i to state j. i and j represent the row and column of the matrix
-           respectively.
+        matrix: A nxn matrix.
+        i: An integer denoting the row id of the cell for which minor needs to calcuclated.
+        j: An integer denoting the column id of the cell for which minor needs to calcuclated.
 
     Returns:
-        A List with numerators ND the least common multiple of the probablities.
+        A (n-1)x(n-1) matrix representing the minor of the matrix at matrix[i][j]
     """
-    def minor(matrix, i, j):
-        """
-        Calculates the minor of a matrix at a particular cell.
+    return [row[:j] + row[j+1:] for k, row in enumerate(matrix) if k != i]
 
-        Args:
-            matrix: A nxn matrix.
-            i: An integer denoting the row id of the cell for which minor needs to calcuclated.
-            j: An integer denoting the column id of the cell for which minor needs to calcuclated.
 
-        Returns:
-            A (n-1)x(n-1) matrix representing the minor of the matrix at matrix[i][j]
-        """
-        return [row[:j] + row[j+1:] for k, row in enumerate(matrix) if k != i]
+def determinant(matrix):
+    """
+    Calculates the determinant of a matrix through a recursive process.
 
-    def determinant(matrix):
-        """
-        Calculates the determinant of a matrix through a recursive process.
+    Args:
+        matrix: A nxn matrix.
 
-        Args:
-            matrix: A nxn matrix.
+    Returns:
+        An integer denoting the determinant of the matrix.
+    """
+    if len(matrix) == 1:
+        return matrix[0][0]
 
-        Returns:
-            An integer denoting the determinant of the matrix.
-        """
-        if len(matrix) == 2:
-            return (matrix[0][0] * matrix[1][1]) - (matrix[0][1] * matrix[1][0])
+    if len(matrix) == 2:
+        return (matrix[0][0] * matrix[1][1]) - (matrix[0][1] * matrix[1][0])
 
-        return sum(((-1) ** j) * matrix[0][j] * determinant(minor(matrix, 0, j))
-                   for j in range(len(matrix[0])))
+    return sum(((-1) ** j) * matrix[0][j] * determinant(minor(matrix, 0, j))
+               for j in range(len(matrix[0])))
 
-    def adjoint(matrix):
-        """
-        Calculates the adjoint also known as the adjucate of the matrix.
-        It is a matrix of cofactors for each element in the matrix.
 
-        Args:
-            matrix: A nxn matrix.
+def adjoint(matrix):
+    """
+    Calculates the adjoint also known as the adjucate of the matrix.
+    It is a matrix of cofactors for each element in the matrix.
 
-        Returns:
-            A nxn matrix of cofactors for each element in the matrix
-        """
-        if len(matrix) == 2:
-            return [[matrix[1][1], -matrix[1][0]], [-matrix[0][1], matrix[0][0]]]
-        return [[((-1) ** (i+j)) * determinant(minor(matrix, i, j))
-                 for j in range(len(matrix[0]))] for i in range(len(matrix))]
+    Args:
+        matrix: A nxn matrix.
 
-    def transpose(matrix):
-        """
-        Produces the transpose of a matrix.
+    Returns:
+        A nxn matrix of cofactors for each element in the matrix
+    """
+    if len(matrix) == 1:
+        return [[1]]
+    if len(matrix) == 2:
+        return [[matrix[1][1], -matrix[1][0]], [-matrix[0][1], matrix[0][0]]]
+    return [[((-1) ** (i+j)) * determinant(minor(matrix, i, j))
+             for j in range(len(matrix[0]))] for i in range(len(matrix))]
 
-        Args:
-            matrix: A nxn matrix.
 
-        Returns:
-            A nxn matrix that is the transpose of the given matrix.
-        """
-        return list(zip(*matrix))
+def transpose(matrix):
+    """
+    Produces the transpose of a matrix.
 
-    def inverse(matrix):
-        """
-        Caclulates the inverse of a matrix with the formula,
-        Inverse(matrix) = (1 / determinant(matrix)) * adjoint(matrix).
+    Args:
+        matrix: A nxn matrix.
 
-        Args:
-            matrix: A nxn invertible matrix.
+    Returns:
+        A nxn matrix that is the transpose of the given matrix.
+    """
+    return list(zip(*matrix))
 
-        Returns:
-            A nxn matrrix that is the inverse of the given matrix.
-        """
-        det = determinant(matrix)
-        adj = adjoint(matrix)
-        adj_transpose = transpose(adj)
-        return [[adj_transpose[i][j] / det
-                 for j in range(len(adj_transpose[0]))] for i in range(len(adj_transpose))]
 
-    def matrix_multiply(A, B):
-        """
-        Multiplies two matrices. The two matrices need to be valid for
-        multiplication.
+def inverse(matrix):
+    """
+    Caclulates the inverse of a matrix with the formula,
+    Inverse(matrix) = (1 / determinant(matrix)) * adjoint(matrix).
 
-        Args:
-            A: A mxn matrix.
-            B: A nxp matrix.
+    Args:
+        matrix: A nxn invertible matrix.
 
-        Returns:
-            A mxp matrix.
-        """
-        result = [[0] * len(B[0]) for _ in range(len(A))]
-        for i in range(len(A)):
-            for j in range(len(B[0])):
-                for k in range(len(B)):
-                    result[i][j] += A[i][k] * B[k][j]
-        return result
-
-    def get_lcm(arr):
-        """
-        Calculates the least common multiple of a list of integers.
+    Returns:
+        A nxn matrrix that is the inverse of the given matrix.
+    """
+    det = determinant(matrix)
+    adj = adjoint(matrix)
+    adj_transpose = transpose(adj)
+    return [[adj_transpose[i][j] / det
+             for j in range(len(adj_transpose[0]))] for i in range(len(adj_transpose))]
 
-        Args:
-            arr: A List of integers.
 
-        Returns:
-            An integer representing the lcm of a list of integers.
-        """
-        lcm = arr[0].denominator
-        for frac in arr:
-            lcm *= frac.denominator // gcd(frac.denominator, lcm)
-        return lcm
+def matrix_multiply(A, B):
+    """
+    Multiplies two matrices. The two matrices need to be valid for
+    multiplication.
+
+    Args:
+        A: A mxn matrix.
+        B: A nxp matrix.
+
+    Returns:
+        A mxp matrix.
+    """
+    result = [[0] * len(B[0]) for _ in range(len(A))]
+    for i in range(len(A)):
+        for j in range(len(B[0])):
+            for k in range(len(B)):
+                result[i][j] += A[i][k] * B[k][j]
+    return result
+
 
-    m_fractions = deepcopy(m)
+def get_lcm(arr):
+    """
+    Calculates the least common multiple of a list of integers.
+
+    Args:
+        arr: A List of integers.
+
+    Returns:
+        An integer representing the lcm of a list of integers.
+    """
+    lcm = arr[0].denominator
+    for frac in arr:
+        lcm *= frac.denominator // gcd(frac.denominator, lcm)
+    return lcm
+
+
+def is_absorbing(row, i):
+    """
+    Checks whether a state is absorbing, that is it has no transitions or only
+    transitions to itself.
+
+    Args:
+        row: A List of integers denoting the transitions from the state.
+        i: An integer denoting the id of the state.
+
+    Returns:
+        A boolean.
+    """
+    row_count = Counter(row)
+    return row_count[0] == len(row) or (row_count[0] == len(row) - 1 and row[i] != 0)
+
+
+def get_fractions(row):
+    """
+    Converts a row of transition counts to probabilities.
+
+    Args:
+        row: A List of integers denoting the transitions from a state.
+
+    Returns:
+        A List of Fractions that add up to 1, or are all 0 if there are no transitions.
+    """
+    row_sum = sum(row)
+    # Helps preserve the probability as a fraction
+    return [Fraction(count, row_sum) if row_sum > 0 else Fraction(0) for count in row]
+
+
+def get_standard_form(m):
+    """
+    Separates the transient and absorbing states and builds the I - Q and R
+    matrices of the standard form of the chain.
+
+    Args:
+        m: A nxn square matrix of integers as accepted by solution().
+
+    Returns:
+        A tuple of (transient states, absorbing states, I - Q, R) where the states
+        are Lists of integers denoting their ids and the matrices are Lists of Fractions.
+    """
+    m_fractions = []
     absorbing_states = []
     transient_states = []
 
     # Separating transient and absorbing states
     for i, row in enumerate(m):
-        row_sum = sum(row)
-        row_count = Counter(row)
-        for j in range(len(m[0])):
-            # Helps preserve the probability as a fraction
-            m_fractions[i][j] = Fraction(
-                m[i][j], row_sum) if row_sum > 0 else Fraction(0)
-        if row_count[0] == len(row) or (row_count[0] == len(row) - 1 and row[i] != 0):
+        m_fractions.append(get_fractions(row))
+        if is_absorbing(row, i):
             absorbing_states.append(i)
         else:
             transient_states.append(i)
@@ -178,12 +231,170 @@ def solution(m):
             j += 1
         i += 1
 
+    return transient_states, absorbing_states, Q, R
+
+
+def get_result(probabilities):
+    """
+    Formats the probabilities of terminating at each absorbing state as numerators
+    over a common denominator.
+
+    Args:
+        probabilities: A List of Fractions.
+
+    Returns:
+        A List with the numerators followed by the least common multiple of the
+        denominators.
+    """
+    lcm = get_lcm(probabilities)
+    result = [(probabilities[j] * lcm).numerator for j in range(len(probabilities))]
+    result.append(lcm)
+    return result
+
+
+def solution(m, stats=None):
+    """
+    Calculates the preobabilities of terminating at abosrbing states.
+
+    Args:
+        m: A nxn square matrix of integers representing the number of transitions
+           from state i to state j. i and j represent the row and column of the matrix
+           respectively. The rows may also be the read-only views returned by
+           tools/matrix_file.py, which are read in place.
+        stats: An optional dict that is filled with "counters" and "timers"
+               entries when given.
+
+    Returns:
+        A List with numerators ND the least common multiple of the probablities.
+    """
+    if stats is not None:
+        start = perf_counter()
+
+    transient_states, absorbing_states, Q, R = get_standard_form(m)
+
+    if stats is not None:
+        standard_form_end = perf_counter()
+
     F = inverse(Q)
+
+    if stats is not None:
+        inverse_end = perf_counter()
+
     prob_of_termination = matrix_multiply(F, R)
 
-    lcm = get_lcm(prob_of_termination[0])
-    result = [(prob_of_termination[0][j] *
-               lcm).numerator for j in range(len(prob_of_termination[0]))]
-    result.append(lcm)
+    if stats is not None:
+        stats.setdefault("counters", {}).update(
+            transient_states=len(transient_states), absorbing_states=len(absorbing_states))
+        stats.setdefault("timers", {}).update(
+            standard_form=standard_form_end - start, inverse=inverse_end - standard_form_end,
+            multiply=perf_counter() - inverse_end)
 
-    return result
+    return get_result(prob_of_termination[0])
+
+
+class AbsorbingChain:
+    """
+    An absorbing Markov chain that keeps its fundamental matrix up to date as the
+    transitions of single states change.
+
+    Attributes:
+        m: A nxn matrix of integers denoting the current transition counts.
+        transient_states: A List of integers denoting the ids of the transient states.
+        absorbing_states: A List of integers denoting the ids of the absorbing states.
+        Q: A List of Lists of Fractions denoting I - Q as built by get_standard_form().
+        R: A List of Lists of Fractions denoting the transition probabilities from the
+           transient states to the absorbing states.
+        F: A List of Lists of Fractions denoting the fundamental matrix Inverse(I - Q).
+    """
+
+    def __init__(self, m):
+        """
+        Args:
+            m: A nxn square matrix of integers as accepted by solution().
+        """
+        self.m = [list(row) for row in m]
+        self.solve()
+
+    def solve(self):
+        """
+        Solves the chain from scratch by inverting I - Q.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        self.transient_states, self.absorbing_states, self.Q, self.R = \
+            get_standard_form(self.m)
+        self.F = inverse(self.Q)
+
+    def probabilities(self):
+        """
+        Calculates the probabilities of terminating at each absorbing state when
+        starting from state 0.
+
+        Args:
+            None.
+
+        Returns:
+            A List with numerators and the least common multiple of the probabilities
+            in the same format as solution().
+        """
+        return get_result(matrix_multiply(self.F[:1], self.R)[0])
+
+    def update_row(self, i, row):
+        """
+        Replaces the transitions from state i and updates the fundamental matrix.
+
+        Args:
+            i: An integer denoting the id of the state.
+            row: A List of integers denoting the new transition counts from state i.
+
+        Returns:
+            A List with numerators and the least common multiple of the updated
+            probabilities in the same format as solution().
+        """
+        was_absorbing = i in self.absorbing_states
+        self.m[i] = list(row)
+
+        if is_absorbing(self.m[i], i) != was_absorbing:
+            self.solve()
+        elif not was_absorbing:
+            self.update_transient_row(i)
+        # The transitions of a state that stays absorbing do not affect the result.
+
+        return self.probabilities()
+
+    def update_transient_row(self, i):
+        """
+        Applies the Sherman-Morrison correction for a new row of a transient state
+        that stays transient. Solves the chain from scratch if the correction is
+        singular.
+
+        Args:
+            i: An integer denoting the id of the state.
+
+        Returns:
+            None.
+        """
+        F = self.F
+        p = self.transient_states.index(i)
+        fractions = get_fractions(self.m[i])
+
+        q_row = [(1 if j == p else 0) - fractions[tr]
+                 for j, tr in enumerate(self.transient_states)]
+        u = [new - old for new, old in zip(q_row, self.Q[p])]
+        self.Q[p] = q_row
+        self.R[p] = [fractions[ab] for ab in self.absorbing_states]
+
+        # u * F and F * e_p
+        u_F = [sum(u[j] * F[j][k] for j in range(len(u)) if u[j]) for k in range(len(F))]
+        F_col = [F[k][p] for k in range(len(F))]
+        denominator = 1 + u_F[p]
+        if denominator == 0:
+            self.solve()
+            return
+
+        self.F = [[F[k][l] - F_col[k] * u_F[l] / denominator for l in range(len(F))]
+                  for k in range(len(F))]
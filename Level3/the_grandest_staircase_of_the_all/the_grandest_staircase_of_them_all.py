@@ -13,15 +13,25 @@ But this is ineffecient because of an additional check in each recursive evaluat
 It is guaranteed that there will only be one such instance and it is easier to remove it
 from the final result.
 
+staircases() lists the staircases themselves as strictly decreasing tuples of heights in
+lexicographic order. It walks the choices of the next step with a single buffer and uses a
+table of counts to skip whole subtrees, so it can start at any rank without generating the
+staircases before it. This allows splitting the staircases into rank ranges across workers.
+
+Passing a dict as stats records the cache hits and misses of the helper and the
+time taken.
+
 Complxity:
 Time: O(n^2)
 Space: O(n^2)
 
 Where, n is the number of steps.
 """
+from itertools import islice
+from time import perf_counter
 
 
-def solution(n):
+def solution(n, stats=None):
     """
     Calculates the number of ways in which bricks can be arranged to
     add up to n so that each step is lower than the previous one and
@@ -29,6 +39,8 @@ def solution(n):
 
     Args:
         n: An integer denoting the maximum sum of heights of steps.
+        stats: An optional dict that is filled with "counters", "timers" and
+               "peaks" entries when given.
 
     Returns:
         An integer.
@@ -53,12 +65,96 @@ def solution(n):
             return 0
 
         if (prev, rem) in cache:
+            if stats is not None:
+                cache_hits[0] += 1
             return cache[(prev, rem)]
 
         cache[(prev, rem)] = helper(prev+1, rem-prev) + helper(prev+1, rem)
         return cache[(prev, rem)]
 
     cache = {}
+    cache_hits = [0]
+    if stats is not None:
+        start = perf_counter()
+
     # Subtract by -1 to exclude the intance where there is only one step that is
     # equal to n. This goes against the rule of building the staircase.
-    return helper(1, n) - 1
+    result = helper(1, n) - 1
+
+    if stats is not None:
+        stats.setdefault("counters", {}).update(
+            cache_hits=cache_hits[0], cache_misses=len(cache))
+        stats.setdefault("timers", {}).update(total=perf_counter() - start)
+        stats.setdefault("peaks", {}).update(cache_size=len(cache))
+
+    return result
+
+
+def get_count_table(n):
+    """
+    Calculates the number of ways of adding up distinct steps to each sum.
+
+    Args:
+        n: An integer denoting the maximum sum and the maximum height of a step.
+
+    Returns:
+        A (n+1)x(n+1) List where the value at [m][r] is the number of sets of distinct
+        heights from 1 to m that add up to r.
+    """
+    table = [[0] * (n + 1) for _ in range(n + 1)]
+    table[0][0] = 1
+    for m in range(1, n + 1):
+        for r in range(n + 1):
+            table[m][r] = table[m-1][r] + (table[m-1][r-m] if r >= m else 0)
+    return table
+
+
+def staircases(n, start=0, stop=None):
+    """
+    Generates the staircases with at least two steps that add up to n in
+    lexicographic order.
+
+    Args:
+        n: An integer denoting the sum of heights of steps.
+        start: An integer denoting the rank of the first staircase to generate.
+        stop: An integer denoting the rank at which to stop or None to generate
+              all remaining staircases.
+
+    Yields:
+        A tuple of integers denoting the heights of the steps in decreasing order.
+    """
+    def walk(bound, rem, skip):
+        """
+        A recursive helper that extends the steps with heights lower than bound
+        adding up to rem.
+
+        Args:
+            bound: An integer denoting the height of the previous step.
+            rem: An integer representing the sum of height remaining.
+            skip: An integer denoting the number of staircases to skip.
+
+        Yields:
+            A tuple of integers denoting the heights of the steps.
+        """
+        if rem == 0:
+            yield tuple(steps)
+            return
+
+        for height in range(1, min(bound - 1, rem) + 1):
+            count = table[height - 1][rem - height]
+            if skip >= count:
+                skip -= count
+                continue
+
+            steps.append(height)
+            yield from walk(height, rem - height, skip)
+            steps.pop()
+            skip = 0
+
+    if n < 3:
+        return iter(())
+
+    table = get_count_table(n)
+    steps = []
+    # A bound of n excludes the staircase made of a single step of height n.
+    return islice(walk(n, n, start), None if stop is None else max(0, stop - start))
@@ -24,9 +24,17 @@ Time: O(n ^ 2)
 Space: O(n ^ 2)
 
 Where, n is the number of rooms.
-The solution can be done in O(1) space if we don't need to preserve the input matrix.
+
+Only the diagonal "rest" values change during the simulation, so they are copied into a
+list of their own and the input matrix is never modified or copied.
+
+batch_solution() evaluates many (entrances, exits) scenarios on the same matrix. The
+matrix is converted once to a tuple of tuples and sent once to each worker process,
+which then only receives the scenarios.
 """
-from copy import deepcopy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
 
 
 def solution(entrances, exits, path):
@@ -38,45 +46,96 @@ def solution(entrances, exits, path):
         exits: A list of integers.
         path: A nxn matrix of integers representing the maximum capacity of the
               path from state i to state j at each time step. i and j represent the
-              row and column of the matrix respectively.
+              row and column of the matrix respectively. The rows may also be the
+              read-only views returned by tools/matrix_file.py, which are read in place.
 
     Returns:
         An integer denoting the maximum number of bunnies able to pass the exit in one time step.
     """
-    path_copy = deepcopy(path)
+    rest = [path[i][i] for i in range(len(path))]
     max_bunnies = 0
 
     entrances_set = set(entrances)
     exits_set = set(exits)
-    intermediates_set = set(range(len(path_copy))) - entrances_set - exits_set
+    intermediates_set = set(range(len(path))) - entrances_set - exits_set
     intermediates = sorted(list(intermediates_set))
 
     # From entrance to intermediate states
     for j in intermediates:
         for i in entrances_set:
-            path_copy[j][j] += path[i][j]
+            rest[j] += path[i][j]
 
     # The right upper half of the cycle in intermediate states
     for i in range(len(intermediates)-1):
         row = intermediates[i]
         for j in range(i+1, len(intermediates)):
             col = intermediates[j]
-            path_copy[col][col] += min(path_copy[row][row], path_copy[row][col])
+            rest[col] += min(rest[row], path[row][col])
 
     # The left lower half of the cycle in intermediate states
     for i in range(1, len(intermediates)):
         row = intermediates[i]
         for j in range(i):
             col = intermediates[j]
-            path_copy[col][col] += min(path_copy[row][row], path_copy[row][col])
+            rest[col] += min(rest[row], path[row][col])
 
     # From entrance and intermediate states to exit states
     for j in exits_set:
         for i in intermediates_set:
-            max_bunnies += min(path_copy[i][j], path_copy[i][i])
-            path_copy[i][i] = max(0, path_copy[i][i] - path_copy[i][j])
+            max_bunnies += min(path[i][j], rest[i])
+            rest[i] = max(0, rest[i] - path[i][j])
 
         for i in entrances_set:
-            max_bunnies += path_copy[i][j]
+            max_bunnies += path[i][j]
 
     return max_bunnies
+
+
+_path = None
+
+
+def _init_worker(path):
+    global _path
+    _path = path
+
+
+def _evaluate(scenario):
+    start = perf_counter()
+    max_bunnies = solution(scenario[0], scenario[1], _path)
+    return max_bunnies, perf_counter() - start
+
+
+def batch_solution(path, scenarios, workers=None):
+    """
+    Calculates the maximum number of bunnies that could reach the exit for many
+    (entrances, exits) scenarios on the same path matrix.
+
+    Args:
+        path: A nxn matrix of integers as accepted by solution().
+        scenarios: A List of (entrances, exits) pairs of Lists of integers.
+        workers: An integer denoting the number of worker processes. Defaults to the
+                 number of CPUs. With 1 the scenarios are evaluated in this process.
+
+    Returns:
+        A dict with the maximum number of bunnies of each scenario under "max_bunnies",
+        the seconds taken by each scenario under "latencies" and the total seconds
+        under "seconds".
+    """
+    start = perf_counter()
+    compact_path = tuple(tuple(row) for row in path)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(compact_path)
+        outputs = [_evaluate(scenario) for scenario in scenarios]
+    else:
+        chunksize = max(1, len(scenarios) // (4 * workers))
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(compact_path,)) as executor:
+            outputs = list(executor.map(_evaluate, scenarios, chunksize=chunksize))
+
+    return {
+        "max_bunnies": [max_bunnies for max_bunnies, _ in outputs],
+        "latencies": [seconds for _, seconds in outputs],
+        "seconds": perf_counter() - start,
+    }
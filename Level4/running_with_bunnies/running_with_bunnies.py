@@ -14,24 +14,31 @@ Vertices where time limit goes to negative (time runs out) when it reaches the e
 vertex are discarded. The set of ids in the current path is yielded and compared with the
 length of the maximum bunnies set.
 
+Passing a dict as stats records the number of search nodes expanded, the peak stack
+size and the time split between the Floyd-Warshall passes and the search.
+
 Complexity:
 Time: O(n ^ 3)
 Space: O(n ^ 2)
 
 Where, n is the number of states (rows) in the path matrix.
 """
-from copy import deepcopy
+from time import perf_counter
 
 
-def solution(times, times_limit):
+def solution(times, times_limit, stats=None):
     """
     Computes the set of bunnies with maximum length that are rescued.
 
     Args:
         times: A nxn matrix of integers representing the time taken to go from vertex i to vertex j
-               where i and j are the row and column indices respectively.
+               where i and j are the row and column indices respectively. The rows may
+               also be the read-only views returned by tools/matrix_file.py, which are
+               read in place.
         times_limit: An integer denoting the amount of time remaining for the bulkhead
                      doors to close at the start.
+        stats: An optional dict that is filled with "counters", "timers" and
+               "peaks" entries when given.
 
     Returns:
         A List containing the column ids of the bunnies that are rescued in ascending order.
@@ -52,7 +59,9 @@ def solution(times, times_limit):
             whether a cycle was found.
         """
         n = len(times)
-        shortest_times = deepcopy(times)
+        # The check for negative cycles returns before changing any value so it can
+        # read the given matrix in place.
+        shortest_times = times if check_neg_cycle else [list(row) for row in times]
         for k in range(n):
             for i in range(n):
                 for j in range(n):
@@ -63,7 +72,7 @@ def solution(times, times_limit):
                             shortest_times[k][j]
         return False if check_neg_cycle else shortest_times
 
-    def get_bunnies(shortest_times, times_limit):
+    def get_bunnies(shortest_times, times_limit, search_stats=None):
         """
         Performs a search over the state space of
         (vertex, path, cycle from that vertex, time limit when starting at that vertex)
@@ -74,6 +83,8 @@ def solution(times, times_limit):
                             indices of the matrix respectively.
             times_limit: An integer denoting the amount of time remaining for the bulkhead
                          doors to close at the start.
+            search_stats: An optional dict with "nodes", "paths" and "peak_stack" keys
+                          that are updated as the search progresses.
 
         Returns:
             None if the length of the set is equal to the number of vertices.
@@ -90,12 +101,15 @@ def solution(times, times_limit):
         all_vertices = set(range(n))
 
         while stack:
+            if search_stats is not None:
+                search_stats["nodes"] += 1
+                search_stats["peak_stack"] = max(search_stats["peak_stack"], len(stack))
             curr_vertex, curr_path, curr_cycle_path, curr_times_limit = stack.pop()
             # Exclude vertices that form a cycle starting from curr_vertex.
             for nxt in all_vertices - set(curr_cycle_path[curr_vertex]):
                 time_to_nxt_from_curr = shortest_times[curr_vertex][nxt]
                 time_to_curr_from_nxt = shortest_times[nxt][curr_vertex]
-                nxt_cyclic_path = deepcopy(curr_cycle_path)
+                nxt_cyclic_path = [list(cycle) for cycle in curr_cycle_path]
 
                 if time_to_curr_from_nxt + time_to_nxt_from_curr == 0:
                     nxt_cyclic_path[curr_vertex].append(nxt)
@@ -110,22 +124,44 @@ def solution(times, times_limit):
                         (nxt, nxt_path, nxt_cyclic_path, nxt_times_limit))
 
                     if nxt == end:
+                        if search_stats is not None:
+                            search_stats["paths"] += 1
                         bunnies = set(nxt_path)
                         yield bunnies
                         if len(bunnies) == n:
                             return
 
+    if stats is not None:
+        start = perf_counter()
+
     shortest_times = floyd(times)
 
+    if stats is not None:
+        floyd_end = perf_counter()
+
     has_negative_cycle = floyd(shortest_times, check_neg_cycle=True)
+
+    search_stats = None
+    if stats is not None:
+        neg_cycle_end = perf_counter()
+        search_stats = {"nodes": 0, "paths": 0, "peak_stack": 0}
+        stats.setdefault("timers", {}).update(
+            floyd=floyd_end - start, negative_cycle=neg_cycle_end - floyd_end)
+
     if has_negative_cycle is True:
         return list(range(len(times) - 2))
 
     max_bunnies = set()
-    for bunnies in get_bunnies(shortest_times, times_limit):
+    for bunnies in get_bunnies(shortest_times, times_limit, search_stats):
         if len(max_bunnies) < len(bunnies) or (len(max_bunnies) == len(bunnies)
                                                and sum(max_bunnies) > sum(bunnies)):
             max_bunnies = bunnies
 
+    if stats is not None:
+        stats.setdefault("counters", {}).update(
+            nodes=search_stats["nodes"], paths=search_stats["paths"])
+        stats.setdefault("timers", {}).update(search=perf_counter() - neg_cycle_end)
+        stats.setdefault("peaks", {}).update(stack=search_stats["peak_stack"])
+
     max_bunnies = sorted(max_bunnies - set([0, len(times) - 1]))
     return [i - 1 for i in max_bunnies]
@@ -11,167 +11,182 @@ traversing along the columns more efficient. Although we can skip the transpose
 still traverse through columns, since python lists are row ordered, the code would
 become more complex with lots of list comprehensions for slicing columns.
 Furthermore, transposing doesn't affect the final result.
-"""
 
-from collections import Counter, defaultdict
-from itertools import product
-
-
-def solution(g):
-    def get_images():
-        """
-        For any 2x2 tuple of booleans this function generates a dictionary
-        that maps the grid to its collapsed value.
-
-        Args:
-            None.
-
-        Returns:
-            A dict with 2x2 grids as keys and either True or False as values.
-            For example:
-            {
-                ((True, False), (False, False)): True,
-                ((True, True), (False, False)): False
-            }
-        """
-        image = {}
-        for row_1 in product([True, False], repeat=2):
-            for row_2 in product([True, False], repeat=2):
-                key = (row_1, row_2)
-                val = sum(row_1) + sum(row_2) == 1
-                image[key] = val
-        return image
-
-    def get_preimages():
-        """
-        This is the reverse of the get_images() function.
-        This function generates a tuple of 2x2 grids called preimages for
-        True and False values.
-
-        Args:
-            None
-
-        Returns:
-            A dict with True and False as keys and a tuple of 2x2 grids as values.
-            Here is a sample of values for both keys:
-            {
-                True: (((True, False), (False, False)),
-                       ((False, True), (False, False))),
-                False: (((True, True), (False, False))
-                        ((True, True), (True, False)))
-            }
-        """
-        pre_image = defaultdict(list)
-        for key, val in IMAGES.items():
-            pre_image[val].append(key)
-        return pre_image
-
-    def get_pair_choices():
-        """
-        This function generates all 4 possible pairs for
-        True and False values.
-
-        Args:
-            None
-
-        Returns:
-            A tuple of pairs of tuples with each pair conprising of
-            True or False values
-        """
-        return tuple(product([True, False], repeat=2))
-
-    def transpose(matrix):
-        """
-        This function produces the transpose of a given matrix.
-
-        Args:
-            matrix: A 2D list of shape mxn.
-
-        Returns:
-            A 2D tuple of nxm values.
-        """
-        return tuple(zip(*matrix))
-
-    def get_first_row_preimage_choices(image_row):
-        """
-        This function generates all possible preimages for the entire
-        first row of the image.
-
-        Args:
-            image_row: A tuple of boolean values in the image of shape 1xn.
-
-        Returns:
-            A tuple of 2x(n+1) tuples representing a valid preimage for the
-            entire given row of the image.
-        """
-        preimage_choices = PREIMAGES[image_row[0]]
-        for i in range(1, len(image_row)):
-            temp = []
-            for preimage_choice in preimage_choices:
-                for lower_row_pair in PAIR_CHOICES:
-                    upper_row_pair = preimage_choice[i]
-                    if IMAGES[(upper_row_pair, lower_row_pair)] == image_row[i]:
-                        temp.append(preimage_choice + (lower_row_pair, ))
-            preimage_choices = tuple(temp)
-
-        return tuple([transpose(preimage) for preimage in preimage_choices])
-
-    def get_row_preimage_choices(image_row):
-        """
-        This function generates all possible preimages for the entire
-        given row of the image.
-
-        Args:
-            image_row: A tuple of boolean values in the image of shape 1xn.
-
-        Returns:
-            A tuple of 2x(n+1) tuples representing a valid preimage for the
-            entire given row of the image.
-        """
-        preimage_choices = []
-        for preimage_row in prev_preimage_second_row_count:
-            choices = []
-            for lower_row_pair in PAIR_CHOICES:
-                upper_row_pair = (preimage_row[0], preimage_row[1])
-                if IMAGES[(upper_row_pair, lower_row_pair)] == image_row[0]:
-                    choices.append(lower_row_pair)
-
-            for i in range(1, len(image_row)):
-                temp = []
-                if not choices:
-                    break
-
-                for choice in choices:
-                    upper_row_pair = (preimage_row[i], preimage_row[i+1])
-                    for bit in (False, True):
-                        lower_row_pair = (choice[i], bit)
-                        if IMAGES[(upper_row_pair, lower_row_pair)] == image_row[i]:
-                            temp.append(choice + (bit, ))
-                choices = temp
-
-            for choice in choices:
-                preimage_choices.append((preimage_row, choice))
-
-        return tuple(preimage_choices)
-
-    IMAGES = get_images()
-    PREIMAGES = get_preimages()
-    PAIR_CHOICES = get_pair_choices()
+Each column of the preimage is stored as a bitmask of its height + 1 cells, where
+bit k is set if cell k has gas. The number of preimages ending in each column lives
+in a list indexed by that bitmask. Two such lists of 2 ^ (height + 1) counts are
+allocated once and swapped after every column, so no intermediate collection of
+(previous column, next column) pairs is ever built. The counts are Python integers
+since the partial counts of an empty grid grow well beyond 64 bits.
 
-    g_transpose = transpose(g)
-    prev_preimage_choices = get_first_row_preimage_choices(g_transpose[0])
-    prev_preimage_second_row_count = Counter(
-        prev_preimage_choices[i][1] for i in range(len(prev_preimage_choices)))
+Passing a dict as stats records the number of states carried per column, the
+peak state count and the time spent on the sweep.
 
-    for i in range(1, len(g_transpose)):
-        next_preimage_second_row_count = Counter()
-        next_preimage_choices = get_row_preimage_choices(g_transpose[i])
+batch_solution() solves many grids at once. The next columns only depend on the
+previous column and the image column, so the grids are grouped by height and each
+group shares one sparse transition table per distinct image column, which also
+bounds the tables to 2 ^ h per height. Entries are filled the first time a grid
+reaches them, as dense grids only ever visit a few previous columns.
 
-        for preimage_choice in next_preimage_choices:
-            if preimage_choice[0] in prev_preimage_second_row_count:
-                next_preimage_second_row_count[preimage_choice[1]
-                                               ] += prev_preimage_second_row_count[preimage_choice[0]]
+Complexity:
+Time: O(w * 2 ^ h * h)
+Space: O(2 ^ h)
 
-        prev_preimage_second_row_count = next_preimage_second_row_count
+Where, w and h are the width and height of the grid.
+"""
 
-    return sum(prev_preimage_second_row_count.values())
+from collections import defaultdict
+from time import perf_counter
+
+
+def transpose(matrix):
+    """
+    This function produces the transpose of a given matrix.
+
+    Args:
+        matrix: A 2D list of shape mxn.
+
+    Returns:
+        A 2D tuple of nxm values.
+    """
+    return tuple(zip(*matrix))
+
+
+def get_next_columns(prev_column, image_column):
+    """
+    This function generates all preimage columns that collapse to the
+    given image column when placed to the right of prev_column.
+
+    The next column is built one cell at a time from the top. Once the
+    cells k of both columns and cell k+1 of the previous column are known,
+    the image cell k fixes cell k+1 of the next column unless two or more
+    of those three cells have gas, in which case an image cell without gas
+    allows both values.
+
+    Args:
+        prev_column: An integer bitmask denoting the previous preimage column.
+        image_column: A tuple of boolean values in the image of shape 1xh.
+
+    Returns:
+        A List of integer bitmasks denoting the valid next preimage columns.
+    """
+    choices = [0, 1]
+    for k, has_gas in enumerate(image_column):
+        upper = (prev_column >> k & 1) + (prev_column >> (k + 1) & 1)
+        bit = 1 << (k + 1)
+        temp = []
+        for choice in choices:
+            total = upper + (choice >> k & 1)
+            if total >= 2:
+                if not has_gas:
+                    temp.append(choice)
+                    temp.append(choice | bit)
+            elif (total == 0) == has_gas:
+                temp.append(choice | bit)
+            else:
+                temp.append(choice)
+        choices = temp
+    return choices
+
+
+def solution(g, stats=None):
+    """
+    Counts the number of previous states that collapse to the given grid.
+
+    Args:
+        g: A 2D list of booleans denoting the current state of the nebula.
+        stats: An optional dict that is filled with "counters", "timers",
+               "peaks" and "series" entries when given.
+
+    Returns:
+        An integer.
+    """
+    if stats is not None:
+        start = perf_counter()
+
+    g_transpose = transpose(g)
+    size = 1 << (len(g_transpose[0]) + 1)
+
+    # Every column is a valid first column of the preimage.
+    prev_counts = [1] * size
+    next_counts = [0] * size
+    zeros = [0] * size
+
+    if stats is not None:
+        column_states = [size]
+        preimage_pairs = 0
+
+    for image_column in g_transpose:
+        for prev_column in range(size):
+            count = prev_counts[prev_column]
+            if count:
+                next_columns = get_next_columns(prev_column, image_column)
+                for next_column in next_columns:
+                    next_counts[next_column] += count
+
+                if stats is not None:
+                    preimage_pairs += len(next_columns)
+
+        prev_counts, next_counts = next_counts, prev_counts
+        next_counts[:] = zeros
+
+        if stats is not None:
+            column_states.append(size - prev_counts.count(0))
+
+    if stats is not None:
+        stats.setdefault("counters", {}).update(
+            columns=len(g_transpose), preimage_pairs=preimage_pairs)
+        stats.setdefault("timers", {}).update(sweep=perf_counter() - start)
+        stats.setdefault("peaks", {}).update(states=max(column_states))
+        stats.setdefault("series", {}).update(column_states=column_states)
+
+    return sum(prev_counts)
+
+
+def batch_solution(grids):
+    """
+    Counts the number of previous states of many grids, sharing the
+    transition tables between grids of the same height.
+
+    Args:
+        grids: A List of 2D lists of booleans. The grids may have different
+               heights and widths.
+
+    Returns:
+        A List of integers with the count of each grid in the given order.
+    """
+    results = [0] * len(grids)
+    indices_by_height = defaultdict(list)
+    for index, grid in enumerate(grids):
+        indices_by_height[len(grid)].append(index)
+
+    for height, indices in indices_by_height.items():
+        size = 1 << (height + 1)
+        prev_counts = [0] * size
+        next_counts = [0] * size
+        zeros = [0] * size
+        ones = [1] * size
+        transitions = {}
+
+        for index in indices:
+            prev_counts[:] = ones
+            for image_column in transpose(grids[index]):
+                if image_column not in transitions:
+                    transitions[image_column] = [None] * size
+                table = transitions[image_column]
+
+                for prev_column, count in enumerate(prev_counts):
+                    if count:
+                        next_columns = table[prev_column]
+                        if next_columns is None:
+                            next_columns = get_next_columns(prev_column, image_column)
+                            table[prev_column] = next_columns
+                        for next_column in next_columns:
+                            next_counts[next_column] += count
+
+                prev_counts, next_counts = next_counts, prev_counts
+                next_counts[:] = zeros
+
+            results[index] = sum(prev_counts)
+
+    return results
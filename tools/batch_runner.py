@@ -0,0 +1,248 @@
+"""
+Runs the solutions over a batch of test cases read as JSONL.
+
+Each input line is a JSON object naming the solution and its arguments:
+
+    {"id": "case-1", "solution": "expanding_nebula", "args": [[[true, false], [false, true]]]}
+
+The solution is either the name of a solution file (without the .py) found under the
+Level folders or a path to the file. "kwargs" may be given for keyword arguments, "stats"
+set to true passes a stats dict to the solution and adds it to the result, and "id" is
+optional. An argument given as {"matrix_file": path} is replaced by the matrix loaded from
+that file with tools/matrix_file.py.
+
+The cases are dispatched to a pool of worker processes. The workers import each solution
+module once and keep it for the following cases, so any module level state survives between
+cases. Each case is limited by a timeout and each worker by a memory cap. The results are
+written as JSONL in the order of the input, followed by a summary of the throughput and
+latency percentiles on stderr.
+
+Usage:
+    python tools/batch_runner.py cases.jsonl -o results.jsonl --workers 4 --timeout 10
+"""
+import argparse
+import importlib.util
+import json
+import os
+import signal
+import sys
+from glob import glob
+from multiprocessing import Pool
+from time import perf_counter
+
+from matrix_file import load_matrix
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_modules = {}
+_timeout = None
+
+
+def find_solution(name):
+    """
+    Finds the file of a solution.
+
+    Args:
+        name: A string denoting either the name of a solution file without the extension
+              or a path to the file, relative to the repository root or absolute.
+
+    Returns:
+        A string denoting the absolute path to the solution file.
+
+    Raises:
+        ValueError: If there is not exactly one matching file.
+    """
+    if name.endswith(".py"):
+        path = os.path.join(ROOT, name)
+        if os.path.isfile(path):
+            return path
+        raise ValueError("No solution file at {}".format(name))
+
+    matches = glob(os.path.join(ROOT, "Level*", "*", name + ".py"))
+    if len(matches) != 1:
+        raise ValueError("Expected one solution named {}, found {}".format(name, len(matches)))
+    return matches[0]
+
+
+def load_solution(name):
+    """
+    Imports the solution function of a module, reusing the module if it was already
+    imported by this process.
+
+    Args:
+        name: A string denoting the solution as accepted by find_solution().
+
+    Returns:
+        The solution function of the module.
+    """
+    if name not in _modules:
+        path = find_solution(name)
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[name] = module
+    return _modules[name].solution
+
+
+def load_arguments(args):
+    """
+    Replaces the matrix file references in the arguments of a case by the loaded matrices.
+
+    Args:
+        args: A List of the JSON decoded arguments of a case.
+
+    Returns:
+        A List of arguments.
+    """
+    return [load_matrix(arg["matrix_file"]) if isinstance(arg, dict) and "matrix_file" in arg
+            else arg for arg in args]
+
+
+def percentile(values, pct):
+    """
+    Calculates a percentile with the nearest rank method.
+
+    Args:
+        values: A sorted List of numbers.
+        pct: A number between 0 and 100.
+
+    Returns:
+        The value at the given percentile or 0 if there are no values.
+    """
+    if not values:
+        return 0
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[rank - 1]
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("Case exceeded {} seconds".format(_timeout))
+
+
+def init_worker(timeout, memory_mb):
+    """
+    Sets up the timeout handler and the memory cap of a worker process.
+
+    Both limits rely on POSIX facilities and are skipped on platforms without them.
+
+    Args:
+        timeout: A number denoting the maximum seconds per case or None.
+        memory_mb: An integer denoting the maximum address space of the worker in
+                   megabytes or None.
+
+    Returns:
+        None.
+    """
+    global _timeout
+    _timeout = timeout
+    if timeout and hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+    if memory_mb and resource is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run_case(line):
+    """
+    Runs a single case in a worker process.
+
+    Args:
+        line: A string denoting one JSONL record.
+
+    Returns:
+        A dict with the id, result, error and seconds taken by the case, along with the
+        stats of the solution if they were requested.
+    """
+    output = {"id": None, "result": None, "error": None, "seconds": 0.0}
+    start = perf_counter()
+    try:
+        case = json.loads(line)
+        output["id"] = case.get("id")
+        solution = load_solution(case["solution"])
+        kwargs = case.get("kwargs", {})
+        if case.get("stats"):
+            kwargs["stats"] = output["stats"] = {}
+
+        if _timeout and hasattr(signal, "SIGALRM"):
+            signal.setitimer(signal.ITIMER_REAL, _timeout)
+        try:
+            output["result"] = solution(*load_arguments(case.get("args", [])), **kwargs)
+        finally:
+            if _timeout and hasattr(signal, "SIGALRM"):
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except Exception as err:
+        output["error"] = "{}: {}".format(type(err).__name__, err)
+    output["seconds"] = perf_counter() - start
+    return output
+
+
+def run(lines, out, workers=None, timeout=None, memory_mb=None, chunksize=1):
+    """
+    Runs the cases on a pool of worker processes and streams the results.
+
+    Args:
+        lines: An iterable of strings denoting JSONL records. Blank lines are skipped.
+        out: A file object to which the results are written as JSONL in input order.
+        workers: An integer denoting the number of worker processes. Defaults to the
+                 number of CPUs.
+        timeout: A number denoting the maximum seconds per case or None.
+        memory_mb: An integer denoting the maximum memory per worker in megabytes or None.
+        chunksize: An integer denoting the number of cases sent to a worker at a time.
+
+    Returns:
+        A dict summarising the cases, errors, wall time, throughput and latencies.
+    """
+    latencies = []
+    errors = 0
+    start = perf_counter()
+    cases = (line for line in lines if line.strip())
+    with Pool(workers, init_worker, (timeout, memory_mb)) as pool:
+        for output in pool.imap(run_case, cases, chunksize):
+            out.write(json.dumps(output) + "\n")
+            out.flush()
+            latencies.append(output["seconds"])
+            errors += output["error"] is not None
+    wall = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "cases": len(latencies),
+        "errors": errors,
+        "seconds": wall,
+        "cases_per_second": len(latencies) / wall if wall > 0 else 0,
+        "latency": {"p50": percentile(latencies, 50), "p90": percentile(latencies, 90),
+                    "p99": percentile(latencies, 99), "max": latencies[-1] if latencies else 0},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run solutions over JSONL test cases.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="JSONL file with the cases, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file for the results")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per case")
+    parser.add_argument("--memory-mb", type=int, default=None, help="memory cap per worker")
+    parser.add_argument("--chunksize", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        summary = run(src, out, args.workers, args.timeout, args.memory_mb, args.chunksize)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmarks the time and peak memory of the Expanding Nebula solution on a random grid.
+
+With --batch N, N random grids of the same height are solved both by looping over
+solution() and by batch_solution(), and the throughput of each is reported in grids per
+second.
+
+Peak memory is the maximum resident set size of the process, so each run should be made
+in a fresh process. To compare against an older version, save that version to a file and
+pass it with --module:
+
+    git show <commit>:Level5/expanding_nebula/expanding_nebula.py > /tmp/nebula_old.py
+    python tools/bench_expanding_nebula.py --module /tmp/nebula_old.py
+    python tools/bench_expanding_nebula.py
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import resource
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULE = os.path.join(ROOT, "Level5", "expanding_nebula", "expanding_nebula.py")
+
+
+def load_module(path):
+    """
+    Imports a module from a file path.
+
+    Args:
+        path: A string denoting the path to the module.
+
+    Returns:
+        The imported module.
+    """
+    spec = importlib.util.spec_from_file_location("expanding_nebula", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def random_grid(height, width, density, seed):
+    """
+    Generates a random grid of booleans.
+
+    Args:
+        height: An integer denoting the number of rows.
+        width: An integer denoting the number of columns.
+        density: A float denoting the probability of a cell having gas.
+        seed: An integer seed for the random number generator.
+
+    Returns:
+        A 2D list of booleans of shape height x width.
+    """
+    rng = random.Random(seed)
+    return [[rng.random() < density for _ in range(width)] for _ in range(height)]
+
+
+def peak_rss_mb():
+    """
+    Reads the peak resident set size of this process.
+
+    Returns:
+        A float denoting the peak resident set size in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes while macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_batch(module, args):
+    """
+    Compares looping over solution() with batch_solution() and prints the throughputs.
+
+    Args:
+        module: The imported Expanding Nebula module.
+        args: The parsed command line arguments.
+
+    Returns:
+        None.
+    """
+    grids = [random_grid(args.height, args.width, args.density, args.seed + i)
+             for i in range(args.batch)]
+
+    start = perf_counter()
+    looped = [module.solution(grid) for grid in grids]
+    loop_seconds = perf_counter() - start
+
+    start = perf_counter()
+    batched = module.batch_solution(grids)
+    batch_seconds = perf_counter() - start
+
+    if looped != batched:
+        raise AssertionError("batch_solution() disagrees with solution()")
+
+    print(json.dumps({
+        "module": args.module,
+        "height": args.height,
+        "width": args.width,
+        "density": args.density,
+        "grids": args.batch,
+        "loop_grids_per_second": args.batch / loop_seconds,
+        "batch_grids_per_second": args.batch / batch_seconds,
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--height", type=int, default=9)
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--density", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    module = load_module(args.module)
+    if args.batch:
+        bench_batch(module, args)
+        return
+
+    grid = random_grid(args.height, args.width, args.density, args.seed)
+    baseline_rss = peak_rss_mb()
+
+    start = perf_counter()
+    result = module.solution(grid)
+    seconds = perf_counter() - start
+
+    print(json.dumps({
+        "module": args.module,
+        "height": args.height,
+        "width": args.width,
+        "density": args.density,
+        "result_bits": result.bit_length(),
+        "seconds": seconds,
+        "rss_before_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Reads and writes integer matrices in a compact binary format shared by the matrix based
+solutions (Doomsday Fuel, Escape Pods and Running with Bunnies).
+
+The file is a 16 byte header followed by the matrix as little-endian signed 64 bit integers
+in row-major order. The header holds the magic bytes b"FBMX" and the format version, the
+number of rows and the number of columns as little-endian unsigned 32 bit integers.
+
+load_matrix() memory maps the file and returns a List of read-only memoryviews, one per row,
+that all point into the mapping. The solutions index, iterate and sum these rows the same way
+as Lists so they can be passed in directly without parsing or copying the matrix.
+
+Usage:
+    python tools/matrix_file.py matrix.json matrix.bin
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b"FBMX"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+
+
+def write_matrix(path, matrix):
+    """
+    Writes a matrix of integers to a file in the binary format.
+
+    Args:
+        path: A string denoting the path of the file.
+        matrix: A mxn matrix of integers.
+
+    Returns:
+        None.
+
+    Raises:
+        ValueError: If the rows of the matrix have different lengths.
+    """
+    rows = len(matrix)
+    cols = len(matrix[0]) if rows else 0
+    values = array("q")
+    for row in matrix:
+        if len(row) != cols:
+            raise ValueError("All rows must have {} columns".format(cols))
+        values.extend(row)
+    if sys.byteorder != "little":
+        values.byteswap()
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, rows, cols))
+        values.tofile(f)
+
+
+def load_matrix(path):
+    """
+    Memory maps a matrix written by write_matrix().
+
+    On big-endian machines the values are byte swapped into memory instead, which copies
+    the matrix once.
+
+    Args:
+        path: A string denoting the path of the file.
+
+    Returns:
+        A List of read-only memoryviews of integers, one per row of the matrix.
+
+    Raises:
+        ValueError: If the file is not a matrix file or its size does not match the header.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError("{} is too short to be a matrix file".format(path))
+        magic, version, rows, cols = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a version {} matrix file".format(path, VERSION))
+
+        size = HEADER.size + rows * cols * 8
+        f.seek(0, 2)
+        if f.tell() != size:
+            raise ValueError("{} should be {} bytes but is {}".format(path, size, f.tell()))
+        if not rows * cols:
+            return [memoryview(b"").cast("q") for _ in range(rows)]
+
+        if sys.byteorder == "little":
+            buffer = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            values = memoryview(buffer)[HEADER.size:].cast("q")
+        else:
+            f.seek(HEADER.size)
+            swapped = array("q")
+            swapped.fromfile(f, rows * cols)
+            swapped.byteswap()
+            values = memoryview(swapped).toreadonly()
+
+    return [values[i * cols:(i + 1) * cols] for i in range(rows)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a JSON matrix to a matrix file.")
+    parser.add_argument("input", help="JSON file with a list of lists of integers")
+    parser.add_argument("output", help="path of the matrix file to write")
+    args = parser.parse_args(argv)
+
+    with open(args.input) as f:
+        write_matrix(args.output, json.load(f))
+
+
+if __name__ == "__main__":
+    main()